@@ -13,19 +13,31 @@ a fase do processo (Abertura → Classificação → Convocação…).
 Notificações via WhatsApp (CallMeBot).
 """
 
-import io
-import json
+import hashlib
+import multiprocessing
 import os
+import queue
 import re
+import tempfile
+import threading
 import time
+import zipfile
+from collections import ChainMap
+from collections.abc import Iterable, MutableMapping
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor,
+)
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import BinaryIO
 from urllib.parse import urljoin
 
+import httpx
+import lxml.etree
+import lxml.html
+import orjson
 import pdfplumber
-import requests
-from bs4 import BeautifulSoup
-from docx import Document as DocxDocument
+from pypdf import PdfReader
 
 # ──────────────────────────────────────────────
 # CONFIGURAÇÃO
@@ -33,11 +45,23 @@ from docx import Document as DocxDocument
 
 MEU_NOME = os.getenv("MEU_NOME", "Renan Bezerra dos Santos")
 
+# Vários nomes (ou variações do mesmo nome) podem ser monitorados,
+# separados por ";" – ex.: "Renan Bezerra dos Santos; Renan B. Santos"
+NOMES_MONITORADOS = [n.strip() for n in MEU_NOME.split(";") if n.strip()]
+
 # CallMeBot – WhatsApp
 CALLMEBOT_PHONE = os.getenv("CALLMEBOT_PHONE", "")
 CALLMEBOT_APIKEY = os.getenv("CALLMEBOT_APIKEY", "")
 
-# Caminho do histórico de documentos já processados
+# Histórico de documentos já processados: um JSON por fonte ("shard")
+# em history/ – um para o DOE e um por grupo de listagens do CPS
+HISTORY_DIR = Path(__file__).parent / "history"
+DOE_SHARD = "doe"
+META_SHARD = "_meta"  # metadados das execuções (ex.: última busca no DOE)
+HASH_SHARD = "_hashes"  # índice SHA-256 → found_name dos documentos do CPS
+CPS_FALLBACK_SHARD = "cps-outros"  # listagens que não existem mais
+
+# Arquivo único usado por versões anteriores; migrado para HISTORY_DIR
 HISTORY_FILE = Path(__file__).parent / "history_pdfs.json"
 
 # Headers para simular navegador comum
@@ -51,41 +75,120 @@ HEADERS = {
 
 REQUEST_TIMEOUT = 30  # segundos
 
+# Download de documentos: blocos de 64 KB; até 2 MB ficam na memória,
+# acima disso o arquivo temporário vai para o disco.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 2 * 1024 * 1024
+
+
+# Falhas temporárias repetidas com backoff exponencial (0,5 s, 1 s, 2 s)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUS = {502, 503, 504}
+
+
+def _build_client() -> httpx.Client:
+    """
+    Cria o cliente HTTP compartilhado. Com HTTP/2 as requisições
+    simultâneas ao mesmo host (CPS, DOE) são multiplexadas numa única
+    conexão; servidores só com HTTP/1.1 seguem com keep-alive normal.
+    """
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=RETRY_TOTAL,  # apenas falhas de conexão
+        limits=httpx.Limits(max_connections=20),
+    )
+    return httpx.Client(
+        transport=transport,
+        headers=HEADERS,
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+CLIENT = _build_client()
+
+# Falhas de requisição tratadas como erro do item (não abortam a execução).
+# URL malformada (InvalidURL) e host inválido para IDNA (UnicodeError) não
+# são subclasses de httpx.HTTPError.
+FETCH_ERRORS = (httpx.HTTPError, httpx.InvalidURL, UnicodeError)
+
+
+def _get(url: str, *, stream: bool = False, **kwargs) -> httpx.Response:
+    """
+    GET pelo CLIENT, repetindo em respostas 502/503/504 com backoff.
+    Com stream=True o corpo não é lido: o chamador deve fechar a resposta.
+    """
+    request = CLIENT.build_request("GET", url, **kwargs)
+    for attempt in range(RETRY_TOTAL + 1):
+        resp = CLIENT.send(request, stream=stream)
+        if resp.status_code not in RETRY_STATUS or attempt == RETRY_TOTAL:
+            return resp
+        resp.close()
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
+    return resp
+
+
 # Base do portal CPS
 CPS_BASE = "https://urhsistemas.cps.sp.gov.br"
 
-# Páginas de listagem de processos (Inscrições Abertas + Em Andamento)
+# Páginas de listagem de processos (Inscrições Abertas + Em Andamento).
+# "shard" é o arquivo do histórico: Abertos e Em Andamento do mesmo tipo
+# compartilham o arquivo, já que o processo migra de uma para a outra.
 LISTING_PAGES: list[dict] = [
     # ── ETEC ──
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/ETEC/PSS/Abertos.aspx",
-     "label": "ETEC – Processo Seletivo Docente – Inscrições Abertas"},
+     "label": "ETEC – Processo Seletivo Docente – Inscrições Abertas",
+     "shard": "etec-pss"},
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/ETEC/PSS/Andamento.aspx",
-     "label": "ETEC – Processo Seletivo Docente – Em Andamento"},
+     "label": "ETEC – Processo Seletivo Docente – Em Andamento",
+     "shard": "etec-pss"},
     {"url": f"{CPS_BASE}/dgsdad/selecaopublica/ETEC/CPD/Abertos.aspx",
-     "label": "ETEC – Concurso Público Docente – Inscrições Abertas"},
+     "label": "ETEC – Concurso Público Docente – Inscrições Abertas",
+     "shard": "etec-cpd"},
     {"url": f"{CPS_BASE}/dgsdad/selecaopublica/ETEC/CPD/emAndamento.aspx",
-     "label": "ETEC – Concurso Público Docente – Em Andamento"},
+     "label": "ETEC – Concurso Público Docente – Em Andamento",
+     "shard": "etec-cpd"},
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/ETEC/Auxiliar/EmAndamento.aspx",
-     "label": "ETEC – Auxiliar de Docente – Em Andamento"},
+     "label": "ETEC – Auxiliar de Docente – Em Andamento",
+     "shard": "etec-auxiliar"},
     # ── FATEC ──
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/FATEC/PSS/inscricoesabertas.aspx",
-     "label": "FATEC – Processo Seletivo Docente – Inscrições Abertas"},
+     "label": "FATEC – Processo Seletivo Docente – Inscrições Abertas",
+     "shard": "fatec-pss"},
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/FATEC/ProcessoSeletivo/EmAndamento.aspx",
-     "label": "FATEC – Processo Seletivo Docente – Em Andamento"},
+     "label": "FATEC – Processo Seletivo Docente – Em Andamento",
+     "shard": "fatec-pss"},
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/FATEC/CPD/Abertos.aspx",
-     "label": "FATEC – Concurso Público Docente – Inscrições Abertas"},
+     "label": "FATEC – Concurso Público Docente – Inscrições Abertas",
+     "shard": "fatec-cpd"},
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/FATEC/CPD/emAndamento.aspx",
-     "label": "FATEC – Concurso Público Docente – Em Andamento"},
+     "label": "FATEC – Concurso Público Docente – Em Andamento",
+     "shard": "fatec-cpd"},
     # ── PSSAD (Auxiliar de Docente – compartilhado ETEC/FATEC) ──
     {"url": f"{CPS_BASE}/dgsdad/SelecaoPublica/PSSAD/Abertos.aspx",
-     "label": "PSSAD – Auxiliar de Docente – Inscrições Abertas"},
+     "label": "PSSAD – Auxiliar de Docente – Inscrições Abertas",
+     "shard": "pssad"},
     {"url": f"{CPS_BASE}/dgsdad/selecaopublica/PSSAD/emAndamento.aspx",
-     "label": "PSSAD – Auxiliar de Docente – Em Andamento"},
+     "label": "PSSAD – Auxiliar de Docente – Em Andamento",
+     "shard": "pssad"},
 ]
 
 # Limite de processos por página de listagem (evita sobrecarga)
 MAX_PROCESSES_PER_PAGE = 50
 
+# Requisições simultâneas ao portal (listagens, detalhes e documentos).
+# Mantido baixo para respeitar o servidor do CPS.
+MAX_WORKERS = 8
+
+# Processos para baixar e analisar documentos (extração de texto de PDF
+# é CPU-bound e não escala com threads por causa do GIL). Cada processo
+# faz um download por vez, então sai da cota de MAX_WORKERS.
+PARSE_WORKERS = max(1, min(os.cpu_count() or 1, MAX_WORKERS // 2))
+
+# Threads para listagens e páginas de detalhes (o restante da cota)
+FETCH_WORKERS = MAX_WORKERS - PARSE_WORKERS
+
 # ──────────────────────────────────────────────
 # MAPA DE FASES – classifica o documento pelo nome/link
 # Ordem reflete a progressão real do processo seletivo.
@@ -109,11 +212,18 @@ PHASE_MAP: list[tuple[str, str]] = [
 ]
 
 
+# PHASE_MAP compilado uma única vez (mesma ordem = mesma prioridade)
+_PHASE_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), phase_label)
+    for pattern, phase_label in PHASE_MAP
+]
+
+
 def classify_phase(doc_name: str, doc_url: str) -> str:
     """Identifica a fase do processo a partir do nome do documento ou URL."""
     combined = f"{doc_name} {doc_url}"
-    for pattern, phase_label in PHASE_MAP:
-        if re.search(pattern, combined, re.IGNORECASE):
+    for pattern, phase_label in _PHASE_PATTERNS:
+        if pattern.search(combined):
             return phase_label
     return "📄 Documento"
 
@@ -136,13 +246,23 @@ DOE_SEARCH_DAYS = 30
 DOE_PAGE_SIZE = 20
 
 
-def search_doe_sp(name: str, history: dict) -> tuple[dict, int]:
+def search_doe_sp(name: str, history: dict,
+                  since: datetime | None = None) -> tuple[int, bool]:
     """
     Busca o nome do candidato no Diário Oficial do Estado de SP
-    via API pública. Retorna (history atualizado, qtd novos).
+    via API pública. Registra as publicações novas em `history`
+    (alterado no próprio dict), com os nomes que as encontraram.
+
+    Sem `since` (primeira busca deste nome) olha os últimos
+    DOE_SEARCH_DAYS dias; com `since` (última busca completa), só a
+    partir dela, com 1 dia de margem para publicações indexadas com atraso.
+    Retorna (qtd novos, busca concluída sem erro).
     """
     today = datetime.now()
-    from_date = (today - timedelta(days=DOE_SEARCH_DAYS)).strftime("%Y-%m-%d")
+    start = today - timedelta(days=DOE_SEARCH_DAYS)
+    if since is not None:
+        start = max(start, since - timedelta(days=1))
+    from_date = start.strftime("%Y-%m-%d")
     to_date = today.strftime("%Y-%m-%d")
 
     new_count = 0
@@ -160,28 +280,35 @@ def search_doe_sp(name: str, history: dict) -> tuple[dict, int]:
         }
 
         try:
-            resp = requests.get(
+            resp = _get(
                 f"{DOE_API_BASE}/v2/advanced-search/publications",
                 params=params,
-                headers=HEADERS,
-                timeout=REQUEST_TIMEOUT,
             )
             resp.raise_for_status()
             data = resp.json()
-        except (requests.RequestException, ValueError) as e:
+        except (httpx.HTTPError, ValueError) as e:
             print(f"  [ERRO] Falha na busca DOE SP (página {page}): {e}")
-            break
+            return new_count, False
 
         items = data.get("items", [])
         if not items:
             break
 
+        page_had_new = False
         for item in items:
             pub_id = item.get("id", "")
             doe_key = f"doe:{pub_id}"
 
-            if doe_key in history:
+            entry = history.get(doe_key)
+            if entry is not None:
+                # Já notificada; se veio da busca de outro nome, só registra
+                # este nome (a página ainda não tinha sido vista por ele)
+                names = entry.get("names", [])
+                if name not in names:
+                    history[doe_key] = {**entry, "names": [*names, name]}
+                    page_had_new = True
                 continue
+            page_had_new = True
 
             title = item.get("title", "Sem título")
             slug = item.get("slug", "")
@@ -203,6 +330,7 @@ def search_doe_sp(name: str, history: dict) -> tuple[dict, int]:
                 "url": pub_url,
                 "matches": matches,
                 "found_name": True,
+                "names": [name],
             }
             new_count += 1
 
@@ -225,43 +353,163 @@ def search_doe_sp(name: str, history: dict) -> tuple[dict, int]:
 
             send_whatsapp(msg)
 
+        # Resultados vêm do mais recente para o mais antigo: uma página
+        # sem nenhuma publicação nova para este nome indica que o restante
+        # já foi visto.
+        if not page_had_new:
+            break
+
         # Próxima página
         if not data.get("hasNextPage", False):
             break
         page += 1
 
-    return history, new_count
+    return new_count, True
 
 
 # ──────────────────────────────────────────────
 # HISTÓRICO
 # ──────────────────────────────────────────────
 
-def load_history() -> dict:
-    """Carrega o JSON com os documentos já processados."""
-    if HISTORY_FILE.exists():
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+class _Shard(dict):
+    """
+    Dict de um shard que marca quando foi alterado, para que History.save
+    só regrave o que mudou. Alterações devem passar por `[]=` ou `del`
+    (registros são substituídos, não editados no lugar).
+    """
+
+    dirty = False
 
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.dirty = True
 
-def save_history(history: dict) -> None:
-    """Salva o JSON atualizado."""
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self.dirty = True
+
+
+class _ShardChain(ChainMap):
+    """
+    Visão sobre vários shards: consultas olham todos; gravações vão para o
+    primeiro e removem a cópia antiga que estiver em outro shard.
+    """
+
+    def __setitem__(self, key, value) -> None:
+        for other in self.maps[1:]:
+            if key in other:
+                del other[key]
+        self.maps[0][key] = value
+
+
+class History:
+    """
+    Histórico de documentos já processados, dividido em arquivos JSON por
+    shard (HISTORY_DIR/<shard>.json). Cada shard é lido do disco na
+    primeira vez que é usado e, ao salvar, só os alterados são regravados.
+    """
+
+    def __init__(self, directory: Path | None = None,
+                 legacy_file: Path | None = None) -> None:
+        self.directory = directory or HISTORY_DIR
+        self.legacy_file = legacy_file or HISTORY_FILE
+        self._shards: dict[str, _Shard] = {}
+        self._migrated = False
+        if not self.directory.exists() and self.legacy_file.exists():
+            self._migrate_legacy()
+        self.meta = self.shard(META_SHARD)
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def _migrate_legacy(self) -> None:
+        """Distribui o history_pdfs.json (arquivo único) entre os shards."""
+        shard_by_label = {lst["label"]: lst["shard"] for lst in LISTING_PAGES}
+        legacy = orjson.loads(self.legacy_file.read_bytes())
+        for key, entry in legacy.items():
+            if key.startswith("doe:"):
+                name = DOE_SHARD
+            else:
+                name = shard_by_label.get(entry.get("listing"), CPS_FALLBACK_SHARD)
+            self._shards.setdefault(name, _Shard())[key] = entry
+        self._migrated = True
+
+    def shard(self, name: str) -> _Shard:
+        """Retorna o dict de um shard, carregando-o do disco se preciso."""
+        if name not in self._shards:
+            path = self._path(name)
+            self._shards[name] = (
+                _Shard(orjson.loads(path.read_bytes())) if path.exists()
+                else _Shard())
+        return self._shards[name]
+
+    def chain(self, primary: str, others: Iterable[str]) -> _ShardChain:
+        """
+        Visão sobre o shard `primary` e os `others` (ver _ShardChain).
+        Assim um documento já registrado por outra listagem continua
+        sendo reconhecido, e fica registrado num único shard.
+        """
+        return _ShardChain(
+            self.shard(primary),
+            *(self.shard(name) for name in others if name != primary))
+
+    def hash_index(self, names: Iterable[str]) -> _Shard:
+        """
+        Índice SHA-256 → found_name (shard HASH_SHARD) dos documentos dos
+        shards `names`. Se ainda não existir, é montado a partir deles.
+        """
+        missing = (HASH_SHARD not in self._shards
+                   and not self._path(HASH_SHARD).exists())
+        index = self.shard(HASH_SHARD)
+        if missing:
+            for name in names:
+                for entry in self.shard(name).values():
+                    if entry.get("sha256"):
+                        index[entry["sha256"]] = entry.get("found_name", False)
+            index.dirty = True
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(data) for name, data in self._shards.items()
+                   if not name.startswith("_"))
+
+    def save(self) -> None:
+        """
+        Salva os shards alterados. Cada um é gravado num arquivo
+        temporário e renomeado por cima do original, para não corromper
+        o histórico se o processo for interrompido no meio da escrita.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, data in self._shards.items():
+            if not data.dirty:
+                continue
+            path = self._path(name)
+            tmp_file = path.with_suffix(".json.tmp")
+            tmp_file.write_bytes(orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS,
+            ))
+            os.replace(tmp_file, path)
+            data.dirty = False
+        if self._migrated:
+            self.legacy_file.unlink(missing_ok=True)
+            self._migrated = False
 
 
 # ──────────────────────────────────────────────
 # NOTIFICAÇÃO – WHATSAPP (CallMeBot)
 # ──────────────────────────────────────────────
 
-def send_whatsapp(message: str) -> None:
-    """Envia mensagem via CallMeBot WhatsApp API."""
-    if not CALLMEBOT_PHONE or not CALLMEBOT_APIKEY:
-        print("[AVISO] CallMeBot não configurado. Mensagem apenas no log:")
-        print(message)
-        return
+# Respeitar rate-limit do CallMeBot (mín. 2 s entre mensagens)
+WHATSAPP_INTERVAL = 3  # segundos
+
+# Mensagens aguardando envio; None sinaliza o fim para a thread de envio
+_whatsapp_queue: queue.Queue[str | None] = queue.Queue()
+_whatsapp_thread: threading.Thread | None = None
+
 
+def _send_whatsapp_now(message: str) -> None:
+    """Envia mensagem via CallMeBot WhatsApp API."""
     url = "https://api.callmebot.com/whatsapp.php"
     params = {
         "phone": CALLMEBOT_PHONE,
@@ -269,31 +517,108 @@ def send_whatsapp(message: str) -> None:
         "apikey": CALLMEBOT_APIKEY,
     }
     try:
-        resp = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        resp = _get(url, params=params)
         if resp.status_code == 200:
             print("[OK] Mensagem WhatsApp enviada.")
         else:
             print(f"[ERRO] CallMeBot retornou status {resp.status_code}: {resp.text}")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"[ERRO] Falha ao enviar WhatsApp: {e}")
 
-    # Respeitar rate-limit do CallMeBot (mín. 2 s entre mensagens)
-    time.sleep(3)
+
+def _whatsapp_worker() -> None:
+    """
+    Envia as mensagens da fila em ordem, esperando apenas o que faltar
+    para completar WHATSAPP_INTERVAL desde o último envio.
+    """
+    last_send = float("-inf")
+    while True:
+        message = _whatsapp_queue.get()
+        if message is None:
+            return
+        wait = WHATSAPP_INTERVAL - (time.monotonic() - last_send)
+        if wait > 0:
+            time.sleep(wait)
+        _send_whatsapp_now(message)
+        last_send = time.monotonic()
+
+
+def send_whatsapp(message: str) -> None:
+    """
+    Enfileira a mensagem para envio via CallMeBot. O envio (e a espera
+    do rate-limit) acontece numa thread própria, sem travar o crawler;
+    flush_whatsapp() aguarda a fila esvaziar.
+    """
+    global _whatsapp_thread
+    if not CALLMEBOT_PHONE or not CALLMEBOT_APIKEY:
+        print("[AVISO] CallMeBot não configurado. Mensagem apenas no log:")
+        print(message)
+        return
+
+    if _whatsapp_thread is None:
+        _whatsapp_thread = threading.Thread(
+            target=_whatsapp_worker, name="whatsapp", daemon=True)
+        _whatsapp_thread.start()
+    _whatsapp_queue.put(message)
+
+
+def flush_whatsapp() -> None:
+    """Aguarda o envio de todas as mensagens enfileiradas."""
+    global _whatsapp_thread
+    if _whatsapp_thread is None:
+        return
+    _whatsapp_queue.put(None)
+    _whatsapp_thread.join()
+    _whatsapp_thread = None
 
 
 # ──────────────────────────────────────────────
 # CRAWLER – DESCOBERTA DE PROCESSOS
 # ──────────────────────────────────────────────
 
-def _get_soup(url: str) -> BeautifulSoup | None:
-    """Faz GET e retorna BeautifulSoup ou None em caso de erro."""
+def _get_html(url: str) -> lxml.html.HtmlElement | None:
+    """
+    Faz GET e retorna a árvore HTML (parser C do lxml) ou None em caso
+    de erro. Os bytes vão direto ao parser, com o charset da resposta.
+    """
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        resp = _get(url)
         resp.raise_for_status()
-        return BeautifulSoup(resp.text, "html.parser")
-    except requests.RequestException as e:
+    except FETCH_ERRORS as e:
         print(f"  [ERRO] Não foi possível acessar {url}: {e}")
         return None
+    try:
+        # Sem charset no Content-Type, o lxml usa o <meta charset> da página
+        parser = lxml.html.HTMLParser(encoding=resp.charset_encoding)
+        return lxml.html.document_fromstring(resp.content, parser=parser)
+    except (lxml.etree.ParserError, LookupError) as e:
+        print(f"  [ERRO] HTML inválido em {url}: {e}")
+        return None
+
+
+# Origem (esquema://host[:porta]) de uma URL: termina no primeiro "/", "?"
+# ou "#" depois do "//". Esquema em maiúsculas fica com o urljoin, que o
+# normaliza para minúsculas.
+_URL_ORIGIN_RE = re.compile(r"[a-z][a-z0-9+.-]*://[^/?#]*")
+
+
+def _join_fast(base: str, href: str) -> str:
+    """
+    Equivalente ao urljoin para as formas de link comuns no portal, sem
+    decompor as URLs: href absoluto é devolvido como está e "/caminho" é
+    concatenado à origem de `base`. As demais formas (relativas, "//host",
+    com "." ou "..", parâmetros/query/fragmento vazios) continuam no urljoin.
+    """
+    if (any(sep in href for sep in ("?#", ";?", ";#"))
+            or href.endswith(("?", "#", ";"))):
+        return urljoin(base, href)
+    if href.startswith(("http://", "https://")):
+        return href
+    if href.startswith("/") and not href.startswith("//") and "/." not in href:
+        origin = _URL_ORIGIN_RE.match(base)
+        if origin:
+            return origin.group() + href
+    return urljoin(base, href)
 
 
 def discover_detail_links(listing_url: str) -> list[str]:
@@ -302,22 +627,20 @@ def discover_detail_links(listing_url: str) -> list[str]:
     das páginas de detalhes dos processos seletivos.
     Retorna até MAX_PROCESSES_PER_PAGE URLs únicas.
     """
-    soup = _get_soup(listing_url)
-    if soup is None:
+    root = _get_html(listing_url)
+    if root is None:
         return []
 
     detail_links: list[str] = []
     seen: set[str] = set()
 
-    for a_tag in soup.find_all("a", href=True):
-        href = a_tag["href"]
-        # Páginas de detalhes contêm o parâmetro oljioahohafnav87412
-        if "oljioahohafnav87412" not in href:
-            continue
-        # Ignorar links javascript:__doPostBack (são os cabeçalhos de ordenação)
-        if href.startswith("javascript:"):
-            continue
-        full_url = urljoin(listing_url, href)
+    # Páginas de detalhes contêm o parâmetro oljioahohafnav87412.
+    # Ignorar links javascript:__doPostBack (são os cabeçalhos de ordenação)
+    for href in root.xpath(
+        '//a[contains(@href, "oljioahohafnav87412")'
+        ' and not(starts-with(normalize-space(@href), "javascript:"))]/@href'
+    ):
+        full_url = _join_fast(listing_url, href.strip())
         if full_url not in seen:
             seen.add(full_url)
             detail_links.append(full_url)
@@ -329,12 +652,52 @@ def discover_detail_links(listing_url: str) -> list[str]:
 # EXTRAÇÃO DE METADADOS DA PÁGINA DE DETALHES
 # ──────────────────────────────────────────────
 
-def extract_metadata(soup: BeautifulSoup) -> dict:
+# Regexes de metadados, compiladas uma única vez. Os trechos capturados
+# são limitados a 300 caracteres: sem o limite, um rótulo sem o
+# terminador esperado faria o ".+?" varrer (e retroceder) a página inteira.
+
+# Nº do Edital – ex: "EDITAL DE ABERTURA Nº  229/11/2026"
+_EDITAL_RE = re.compile(
+    r"EDITAL\s+DE\s+ABERTURA\s+N[ºo°]\s*([\d/]+)",
+    re.IGNORECASE,
+)
+
+# Unidade de Ensino e Cidade
+# Padrão: "CÓD. DA UNIDADE:  229 - UNIDADE DE ENSINO:  Escola ... - CIDADE: São Paulo"
+_UNIDADE_RE = re.compile(
+    r"UNIDADE\s+DE\s+ENSINO:\s*(.{1,300}?)\s*-\s*CIDADE:\s*(.{1,300}?)(?:\n|CURSO|DISCIPLINA|COMPONENTE|REQUISITO|Os pedidos|Per[ií]odo)",
+    re.IGNORECASE,
+)
+
+# Disciplina ou Componente Curricular
+_DISCIPLINA_RE = re.compile(
+    r"(?:DISCIPLINA|COMPONENTE\s+CURRICULAR):\s*(?:\d+\s*-\s*)?(.{1,300}?)(?:\n|REQUISITO|Os pedidos|Per[ií]odo)",
+    re.IGNORECASE,
+)
+
+_CURSO_RE = re.compile(
+    r"CURSO:\s*(.{1,300}?)(?:\n|DISCIPLINA|COMPONENTE|REQUISITO|Os pedidos|Per[ií]odo)",
+    re.IGNORECASE,
+)
+
+
+def page_text(root: lxml.html.HtmlElement) -> str:
     """
-    Extrai metadados do processo a partir do texto da página de detalhes.
-    Retorna dict com: edital, unidade, cidade, disciplina/curso.
+    Texto visível da página (sem <script>/<style>), com os trechos unidos
+    por espaço. Nós só com espaços já são descartados no próprio XPath.
+    """
+    chunks = (chunk.strip() for chunk in root.xpath(
+        "//text()[normalize-space()]"
+        "[not(ancestor::script or ancestor::style)]"))
+    return " ".join(chunk for chunk in chunks if chunk)
+
+
+def extract_metadata(text: str) -> dict:
+    """
+    Extrai metadados do processo a partir do texto da página de detalhes
+    (ver page_text). Retorna dict com: edital, unidade, cidade,
+    disciplina/curso.
     """
-    text = soup.get_text(" ", strip=True)
 
     meta: dict = {
         "edital": "",
@@ -343,38 +706,22 @@ def extract_metadata(soup: BeautifulSoup) -> dict:
         "disciplina": "",
     }
 
-    # Nº do Edital – ex: "EDITAL DE ABERTURA Nº  229/11/2026"
-    m = re.search(
-        r"EDITAL\s+DE\s+ABERTURA\s+N[ºo°]\s*([\d/]+)",
-        text, re.IGNORECASE,
-    )
+    m = _EDITAL_RE.search(text)
     if m:
         meta["edital"] = m.group(1).strip()
 
-    # Unidade de Ensino e Cidade
-    # Padrão: "CÓD. DA UNIDADE:  229 - UNIDADE DE ENSINO:  Escola ... - CIDADE: São Paulo"
-    m = re.search(
-        r"UNIDADE\s+DE\s+ENSINO:\s*(.+?)\s*-\s*CIDADE:\s*(.+?)(?:\n|CURSO|DISCIPLINA|COMPONENTE|REQUISITO|Os pedidos|Per[ií]odo)",
-        text, re.IGNORECASE,
-    )
+    m = _UNIDADE_RE.search(text)
     if m:
         meta["unidade"] = m.group(1).strip()
         meta["cidade"] = m.group(2).strip()
 
-    # Disciplina ou Componente Curricular
-    m = re.search(
-        r"(?:DISCIPLINA|COMPONENTE\s+CURRICULAR):\s*(?:\d+\s*-\s*)?(.+?)(?:\n|REQUISITO|Os pedidos|Per[ií]odo)",
-        text, re.IGNORECASE,
-    )
+    m = _DISCIPLINA_RE.search(text)
     if m:
         meta["disciplina"] = m.group(1).strip()
 
     # Se não achou disciplina, tenta CURSO
     if not meta["disciplina"]:
-        m = re.search(
-            r"CURSO:\s*(.+?)(?:\n|DISCIPLINA|COMPONENTE|REQUISITO|Os pedidos|Per[ií]odo)",
-            text, re.IGNORECASE,
-        )
+        m = _CURSO_RE.search(text)
         if m:
             meta["disciplina"] = m.group(1).strip()
 
@@ -385,28 +732,31 @@ def extract_metadata(soup: BeautifulSoup) -> dict:
 # SCRAPING – DOCUMENTOS NA PÁGINA DE DETALHES
 # ──────────────────────────────────────────────
 
+_DOC_LINK_RE = re.compile(r"\.(pdf|docx?)(\?.*)?\Z", re.IGNORECASE)
+
+
 def fetch_detail_page(detail_url: str) -> tuple[dict, list[dict]]:
     """
     Acessa a página de detalhes de um processo e retorna:
     1. Metadados (edital, unidade, cidade, disciplina)
     2. Lista de documentos encontrados (PDF e DOCX)
     """
-    soup = _get_soup(detail_url)
-    if soup is None:
+    root = _get_html(detail_url)
+    if root is None:
         return {}, []
 
-    meta = extract_metadata(soup)
+    meta = extract_metadata(page_text(root))
 
     docs: list[dict] = []
-    doc_pattern = re.compile(r"\.(pdf|docx?)(\?.*)?$", re.IGNORECASE)
 
-    for a_tag in soup.find_all("a", href=True):
-        href = a_tag["href"]
-        match = doc_pattern.search(href)
+    for a_tag in root.xpath("//a[@href]"):
+        href = a_tag.get("href").strip()
+        match = _DOC_LINK_RE.search(href)
         if not match:
             continue
-        full_url = urljoin(detail_url, href)
-        name = a_tag.get_text(strip=True) or href.split("/")[-1].split("?")[0]
+        full_url = _join_fast(detail_url, href)
+        name = ("".join(chunk.strip() for chunk in a_tag.itertext())
+                or href.split("/")[-1].split("?")[0])
         ext = match.group(1).lower()
         if ext == "doc":
             ext = "docx"
@@ -420,60 +770,276 @@ def fetch_detail_page(detail_url: str) -> tuple[dict, list[dict]]:
 # ANÁLISE DE DOCUMENTOS (PDF e DOCX)
 # ──────────────────────────────────────────────
 
-def _download(url: str) -> bytes | None:
-    """Baixa um arquivo na memória e retorna os bytes."""
+# Hashes SHA-256 de conteúdos já analisados → found_name. Preenchido em
+# cada processo do pool (ver _init_doc_worker) com o histórico do início
+# da execução; evita reanalisar o mesmo arquivo publicado em outra URL.
+_KNOWN_HASHES: dict[str, bool] = {}
+
+
+def _init_doc_worker(known_hashes: dict[str, bool]) -> None:
+    """Inicializa um processo do pool de documentos."""
+    _KNOWN_HASHES.update(known_hashes)
+
+
+def _download(url: str, known: dict | None = None
+              ) -> tuple[str, BinaryIO | None, dict]:
+    """
+    Baixa um arquivo em blocos para um arquivo temporário "spooled":
+    arquivos pequenos ficam na memória, os grandes vão para o disco.
+
+    Se `known` (registro do histórico) tiver ETag/Last-Modified, faz um GET
+    condicional. Calcula o SHA-256 durante o download.
+
+    Retorna (status, arquivo, validadores), com status "ok", "inalterado"
+    (HTTP 304) ou "erro". Em "ok" o arquivo está posicionado no início e
+    o chamador deve fechá-lo; validadores = etag, last_modified e sha256.
+    """
+    headers: dict[str, str] = {}
+    if known:
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    digest = hashlib.sha256()
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT * 2)
-        resp.raise_for_status()
-        return resp.content
-    except requests.RequestException as e:
+        resp = _get(url, stream=True, headers=headers,
+                    timeout=REQUEST_TIMEOUT * 2)
+        try:
+            if resp.status_code == 304:
+                spool.close()
+                return "inalterado", None, {}
+            resp.raise_for_status()
+            for chunk in resp.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+                digest.update(chunk)
+            validators = {
+                "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+                "sha256": digest.hexdigest(),
+            }
+        finally:
+            resp.close()
+    except FETCH_ERRORS as e:
         print(f"  [ERRO] Falha ao baixar {url}: {e}")
+        spool.close()
+        return "erro", None, {}
+    spool.seek(0)
+    return "ok", spool, validators
+
+
+def compile_name_matcher(names: list[str]) -> re.Pattern:
+    """
+    Compila os nomes monitorados (em minúsculas) numa única regex
+    alternada, aplicada ao texto em minúsculas: cada página/documento é
+    percorrido uma só vez, independentemente da quantidade de nomes.
+    """
+    return re.compile("|".join(re.escape(name.lower()) for name in names))
+
+
+def name_key_words(names: list[str]) -> list[str]:
+    """
+    Palavra mais longa (em minúsculas) de cada nome monitorado: a chave
+    usada pelo pré-filtro de PDF, por ser a mais seletiva de cada nome.
+    """
+    return [max(name.lower().split(), key=len) for name in names]
+
+
+# ──────────────────────────────────────────────
+# PRÉ-FILTRO DE PDF – "grep" nos content streams antes de extrair texto
+# Só é aplicado quando os bytes das strings do content stream são o
+# próprio texto da página: fontes simples em WinAnsiEncoding, sem
+# /ToUnicode e sem Form XObjects (que têm content streams próprios).
+# Em qualquer outro caso (fontes CID/Type0, Type3, mapeamentos próprios)
+# a página segue direto para a extração de texto.
+# ──────────────────────────────────────────────
+
+_SIMPLE_FONT_SUBTYPES = {"/Type1", "/MMType1", "/TrueType"}
+
+# Strings literais (um nível de parênteses aninhados) e strings hex
+_PDF_STRING_RE = re.compile(
+    rb"\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)|<[0-9A-Fa-f\s]*>",
+    re.DOTALL,
+)
+_PDF_ESCAPE_RE = re.compile(rb"\\([nrtbf()\\]|[0-7]{1,3}|\r\n|\r|\n)")
+_PDF_ESCAPES = {
+    b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+    b"(": b"(", b")": b")", b"\\": b"\\",
+}
+
+
+def _unescape_pdf_literal(m: re.Match) -> bytes:
+    """Resolve um escape de string literal PDF (\\n, \\(, \\351…)."""
+    esc = m.group(1)
+    if esc in _PDF_ESCAPES:
+        return _PDF_ESCAPES[esc]
+    if esc[:1].isdigit():
+        return bytes([int(esc, 8) & 0xFF])
+    return b""  # barra invertida + quebra de linha = continuação
+
+
+def _page_may_contain(page, key_words: list[str]) -> bool | None:
+    """
+    Procura as palavras-chave direto nas strings do content stream da
+    página, sem extrair texto. Retorna False quando é seguro afirmar que
+    nenhuma aparece, True quando alguma aparece (a extração confirma) e
+    None quando a página não se presta ao pré-filtro.
+    """
+    if "/Resources" not in page:
+        return None
+    resources = page["/Resources"]
+    if "/Font" not in resources:
+        return None
+    if "/XObject" in resources:
+        xobjects = resources["/XObject"]
+        for key in xobjects:
+            if xobjects[key].get("/Subtype") == "/Form":
+                return None
+    fonts = resources["/Font"]
+    for key in fonts:
+        font = fonts[key]
+        if (font.get("/Subtype") not in _SIMPLE_FONT_SUBTYPES
+                or "/Encoding" not in font
+                or font["/Encoding"] != "/WinAnsiEncoding"
+                or "/ToUnicode" in font):
+            return None
+
+    contents = page.get_contents()
+    if contents is None:
         return None
+    chunks: list[bytes] = []
+    for m in _PDF_STRING_RE.finditer(contents.get_data()):
+        token = m.group()
+        if token[:1] == b"(":
+            chunks.append(_PDF_ESCAPE_RE.sub(_unescape_pdf_literal, token[1:-1]))
+        else:
+            hex_digits = b"".join(token[1:-1].split())
+            if len(hex_digits) % 2:
+                hex_digits += b"0"
+            chunks.append(bytes.fromhex(hex_digits.decode("ascii")))
+    if not chunks:
+        return None
+
+    # Trechos concatenados sem separador: palavras quebradas em vários
+    # Tj/TJ (kerning) voltam a ficar contíguas.
+    text = b"".join(chunks).decode("cp1252", errors="replace").lower()
+    return any(word in text for word in key_words)
 
 
-def check_name_in_pdf(content: bytes, name: str) -> bool:
-    """Verifica se o nome aparece em um PDF (case insensitive)."""
-    name_lower = name.lower()
+def check_name_in_pdf(fp: BinaryIO, matcher: re.Pattern,
+                      key_words: list[str] | None = None) -> bool:
+    """
+    Verifica se algum dos nomes do matcher aparece em um PDF.
+    Usa o pypdf (extração de texto simples, bem mais rápida); só recorre
+    ao pdfplumber se nenhuma página tiver texto extraível (ex.: PDF escaneado).
+    Com `key_words`, páginas descartadas pelo pré-filtro nem têm o texto
+    extraído.
+    """
+    # Busca página a página: o pypdf só lê o xref ao abrir o arquivo e
+    # resolve cada página sob demanda, então no primeiro acerto o restante
+    # do documento nem chega a ser carregado.
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
+        reader = PdfReader(fp, strict=False)
+        has_text = False
+        for i in range(len(reader.pages)):
+            page = reader.pages[i]
+            if key_words and _page_may_contain(page, key_words) is False:
+                has_text = True
+                continue
+            text = page.extract_text() or ""
+            if text.strip():
+                has_text = True
+            if matcher.search(text.lower()):
+                return True
+        if has_text:
+            return False
+    except Exception as e:
+        print(f"  [AVISO] pypdf falhou, tentando pdfplumber: {e}")
+
+    try:
+        fp.seek(0)
+        with pdfplumber.open(fp) as pdf:
             for page in pdf.pages:
                 text = page.extract_text() or ""
-                if name_lower in text.lower():
+                # Libera objetos de layout já analisados desta página
+                page.close()
+                if matcher.search(text.lower()):
                     return True
     except Exception as e:
         print(f"  [ERRO] Falha ao ler PDF: {e}")
     return False
 
 
-def check_name_in_docx(content: bytes, name: str) -> bool:
-    """Verifica se o nome aparece em um DOCX (case insensitive)."""
-    name_lower = name.lower()
+# Elementos do WordprocessingML: parágrafo e trecho de texto (run)
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = f"{_W_NS}p"
+_W_T = f"{_W_NS}t"
+
+
+def check_name_in_docx(fp: BinaryIO, matcher: re.Pattern) -> bool:
+    """
+    Verifica se algum dos nomes do matcher aparece em um DOCX.
+    Lê o word/document.xml direto do zip, em streaming, sem montar o
+    modelo de objetos do python-docx. O texto de cada parágrafo (inclusive
+    os de células de tabela) é a junção dos seus <w:t>, já que o Word
+    costuma quebrar uma mesma palavra em vários trechos.
+    """
     try:
-        doc = DocxDocument(io.BytesIO(content))
-        for para in doc.paragraphs:
-            if name_lower in para.text.lower():
-                return True
-        # Verificar também tabelas
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if name_lower in cell.text.lower():
-                        return True
+        with zipfile.ZipFile(fp) as zf, zf.open("word/document.xml") as xml:
+            runs: list[str] = []
+            for _, el in lxml.etree.iterparse(
+                xml, events=("end",), tag=(_W_T, _W_P),
+                resolve_entities=False, no_network=True,
+            ):
+                if el.tag == _W_T:
+                    runs.append(el.text or "")
+                    continue
+                if matcher.search("".join(runs).lower()):
+                    return True
+                runs.clear()
+                el.clear()
     except Exception as e:
         print(f"  [ERRO] Falha ao ler DOCX: {e}")
     return False
 
 
-def check_name_in_document(url: str, ext: str, name: str) -> bool:
-    """Baixa o documento e verifica se o nome aparece."""
-    content = _download(url)
-    if content is None:
-        return False
-    if ext == "pdf":
-        return check_name_in_pdf(content, name)
-    elif ext in ("docx", "doc"):
-        return check_name_in_docx(content, name)
-    return False
+def check_name_in_document(url: str, ext: str, names: list[str],
+                           known: dict | None = None) -> dict:
+    """
+    Baixa o documento e verifica se algum dos nomes aparece
+    (case insensitive).
+    `known` é o registro do histórico quando a URL já foi analisada antes.
+
+    Retorna dict com "status":
+    - "inalterado": mesmo conteúdo do histórico (304 ou mesmo SHA-256;
+      neste caso traz os validadores novos, que podem ter mudado);
+    - "duplicado": conteúdo idêntico a outro documento já analisado;
+    - "novo": documento analisado agora;
+    - "erro": falha no download.
+    Nos demais casos traz também "found_name" e os validadores HTTP/hash.
+    """
+    status, fp, validators = _download(url, known)
+    if status == "inalterado":
+        return {"status": "inalterado"}
+    if fp is None:
+        return {"status": "erro", "found_name": False}
+
+    with fp:
+        sha256 = validators["sha256"]
+        if known and known.get("sha256") == sha256:
+            return {"status": "inalterado", **validators}
+        if sha256 in _KNOWN_HASHES:
+            return {"status": "duplicado",
+                    "found_name": _KNOWN_HASHES[sha256], **validators}
+
+        matcher = compile_name_matcher(names)
+        found = False
+        if ext == "pdf":
+            found = check_name_in_pdf(fp, matcher, name_key_words(names))
+        elif ext in ("docx", "doc"):
+            found = check_name_in_docx(fp, matcher)
+    return {"status": "novo", "found_name": found, **validators}
 
 
 # ──────────────────────────────────────────────
@@ -526,29 +1092,72 @@ def build_message_not_found(doc_name: str, doc_url: str, phase: str,
 # LÓGICA PRINCIPAL
 # ──────────────────────────────────────────────
 
-def process_detail_page(detail_url: str, label: str, history: dict) -> dict:
+def submit_documents(docs: list[dict], history: MutableMapping[str, dict],
+                     doc_pool: Executor,
+                     queued: set[str]) -> list[tuple[dict, dict | None, Future]]:
+    """
+    Dispara no doc_pool o download/análise dos documentos de uma página de
+    detalhes: os novos e os já conhecidos com validadores (revalidados via
+    GET condicional). Registros antigos, sem validadores, continuam sendo
+    ignorados. `queued` evita analisar duas vezes a mesma URL na execução.
+    """
+    pending: list[tuple[dict, dict | None, Future]] = []
+    for doc_info in docs:
+        doc_url = doc_info["url"]
+        if doc_url in queued:
+            continue
+        known = history.get(doc_url)
+        if known is not None and not known.get("sha256"):
+            continue
+        queued.add(doc_url)
+        future = doc_pool.submit(
+            check_name_in_document, doc_url, doc_info["ext"],
+            NOMES_MONITORADOS, known)
+        pending.append((doc_info, known, future))
+    return pending
+
+
+def process_detail_page(detail_url: str, label: str, meta: dict,
+                        pending: list[tuple[dict, dict | None, Future]],
+                        history: MutableMapping[str, dict],
+                        hashes: MutableMapping[str, bool]) -> int:
     """
-    Processa uma página de detalhes de um processo seletivo.
-    Retorna o history atualizado.
+    Registra os documentos de uma página de detalhes, já disparados por
+    submit_documents. Histórico e notificações seguem a ordem da página.
+    Altera `history` e o índice de `hashes` (SHA-256 → found_name) no
+    próprio mapeamento e retorna quantos documentos (novos ou atualizados)
+    foram registrados.
     """
-    meta, docs = fetch_detail_page(detail_url)
-    if not docs:
-        return history
+    if not pending:
+        return 0
 
     edital_info = meta.get("edital", "?")
     unidade_info = meta.get("unidade", "?")
+    new_count = 0
 
-    for doc_info in docs:
+    for doc_info, known, future in pending:
         doc_url = doc_info["url"]
         doc_name = doc_info["name"]
         doc_ext = doc_info["ext"]
         doc_phase = doc_info["phase"]
 
-        if doc_url in history:
+        result = future.result()
+        if result["status"] == "inalterado":
+            # Mesmo conteúdo: só atualiza ETag/Last-Modified, se mudaram,
+            # para que a próxima revalidação possa responder 304
+            if "sha256" in result and (
+                    known.get("etag") != result["etag"]
+                    or known.get("last_modified") != result["last_modified"]):
+                history[doc_url] = {**known, "etag": result["etag"],
+                                    "last_modified": result["last_modified"]}
+            continue
+        if known is not None and result["status"] == "erro":
+            # Falha ao revalidar: mantém o registro anterior
             continue
 
-        print(f"    [NOVO] {doc_phase} | {doc_name} (.{doc_ext})")
-        found = check_name_in_document(doc_url, doc_ext, MEU_NOME)
+        tag = "NOVO" if known is None else "ATUALIZADO"
+        print(f"    [{tag}] {doc_phase} | {doc_name} (.{doc_ext})")
+        found = result["found_name"]
 
         # Registrar no histórico
         history[doc_url] = {
@@ -561,7 +1170,17 @@ def process_detail_page(detail_url: str, label: str, history: dict) -> dict:
             "cidade": meta.get("cidade", ""),
             "disciplina": meta.get("disciplina", ""),
             "found_name": found,
+            "etag": result.get("etag", ""),
+            "last_modified": result.get("last_modified", ""),
+            "sha256": result.get("sha256", ""),
         }
+        if result.get("sha256"):
+            hashes[result["sha256"]] = found
+        new_count += 1
+
+        if result["status"] == "duplicado":
+            print("    Conteúdo idêntico a um documento já analisado – sem nova notificação.")
+            continue
 
         if found:
             msg = build_message_found(
@@ -574,46 +1193,115 @@ def process_detail_page(detail_url: str, label: str, history: dict) -> dict:
 
         send_whatsapp(msg)
 
-    return history
+    return new_count
 
 
 def main() -> None:
     print("Bot de Rastreamento de Concursos ETEC/FATEC (Crawler Autônomo)")
-    print(f"Nome monitorado: {MEU_NOME}")
+    print(f"Nome(s) monitorado(s): {'; '.join(NOMES_MONITORADOS)}")
     print(f"Páginas de listagem: {len(LISTING_PAGES)}")
 
-    history = load_history()
+    history = History()
     total_new = 0
 
-    for listing in LISTING_PAGES:
-        listing_url = listing["url"]
-        label = listing["label"]
-
-        print(f"\n{'='*60}")
-        print(f"[LISTAGEM] {label}")
-        print(f"  {listing_url}")
-        print(f"{'='*60}")
+    # Shards do CPS: todos são consultados ao decidir se um documento é novo
+    cps_shards = list(dict.fromkeys(
+        [lst["shard"] for lst in LISTING_PAGES] + [CPS_FALLBACK_SHARD]))
+
+    # Documentos são analisados em processos separados ("spawn": cada
+    # processo cria sua própria sessão HTTP, sem herdar sockets/threads).
+    known_hashes = history.hash_index(cps_shards)
+    doc_pool = ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_doc_worker,
+        initargs=(dict(known_hashes),),
+    )
 
-        detail_links = discover_detail_links(listing_url)
-        if not detail_links:
-            print("  Nenhum processo encontrado nesta página.")
-            continue
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool, doc_pool:
+        # Todas as listagens em paralelo
+        found_links = list(pool.map(
+            discover_detail_links, [lst["url"] for lst in LISTING_PAGES]))
+
+        # O mesmo processo pode aparecer em mais de uma listagem (ex.:
+        # Abertos e Em Andamento): cada página de detalhes é buscada uma
+        # única vez, na primeira listagem em que aparece.
+        seen_details: set[str] = set()
+        all_links: list[list[str]] = []
+        for detail_links in found_links:
+            unique = [url for url in detail_links if url not in seen_details]
+            seen_details.update(unique)
+            all_links.append(unique)
+
+        # Todas as páginas de detalhes já entram na fila; o processamento
+        # abaixo consome os resultados na ordem enquanto o pool trabalha.
+        all_pages = [
+            [pool.submit(fetch_detail_page, url) for url in detail_links]
+            for detail_links in all_links
+        ]
+
+        # Documentos de todas as páginas vão para o doc_pool à medida que
+        # as páginas chegam, antes de qualquer resultado ser consumido.
+        listing_histories = [
+            history.chain(lst["shard"], cps_shards) for lst in LISTING_PAGES]
+        queued: set[str] = set()
+        all_pending = []
+        for listing_history, pages in zip(listing_histories, all_pages):
+            listing_pending = []
+            for page in pages:
+                meta, docs = page.result()
+                listing_pending.append((meta, submit_documents(
+                    docs, listing_history, doc_pool, queued)))
+            all_pending.append(listing_pending)
+
+        for listing, found, detail_links, listing_history, listing_pending in zip(
+                LISTING_PAGES, found_links, all_links, listing_histories,
+                all_pending):
+            listing_url = listing["url"]
+            label = listing["label"]
+
+            print(f"\n{'='*60}")
+            print(f"[LISTAGEM] {label}")
+            print(f"  {listing_url}")
+            print(f"{'='*60}")
+
+            if not found:
+                print("  Nenhum processo encontrado nesta página.")
+                continue
 
-        print(f"  {len(detail_links)} processo(s) encontrado(s).")
+            print(f"  {len(found)} processo(s) encontrado(s).")
+            repeated = len(found) - len(detail_links)
+            if repeated:
+                print(f"  {repeated} já visto(s) em outra listagem – ignorado(s).")
 
-        for i, detail_url in enumerate(detail_links, 1):
-            print(f"  [{i}/{len(detail_links)}] {detail_url}")
-            old_count = len(history)
-            history = process_detail_page(detail_url, label, history)
-            total_new += len(history) - old_count
+            for i, (detail_url, (meta, pending)) in enumerate(
+                    zip(detail_links, listing_pending), 1):
+                print(f"  [{i}/{len(detail_links)}] {detail_url}")
+                total_new += process_detail_page(
+                    detail_url, label, meta, pending, listing_history,
+                    known_hashes)
 
     # ── FASE 2: Diário Oficial do Estado de SP ──
     print(f"\n{'='*60}")
     print(f"[DOE SP] Buscando nome no Diário Oficial do Estado de SP")
-    print(f"  Período: últimos {DOE_SEARCH_DAYS} dias")
+    print(f"  Período: desde a última busca (até {DOE_SEARCH_DAYS} dias)")
     print(f"{'='*60}")
 
-    history, doe_new = search_doe_sp(MEU_NOME, history)
+    # Última busca completa de cada nome; só ela avança a janela do DOE
+    last_doe_run: dict = dict(history.meta.get("last_doe_run", {}))
+    doe_history = history.shard(DOE_SHARD)
+    doe_new = 0
+    for name in NOMES_MONITORADOS:
+        started = datetime.now()
+        since = last_doe_run.get(name)
+        count, complete = search_doe_sp(
+            name, doe_history,
+            datetime.fromisoformat(since) if since else None,
+        )
+        doe_new += count
+        if complete:
+            last_doe_run[name] = started.isoformat(timespec="seconds")
+    history.meta["last_doe_run"] = last_doe_run
     total_new += doe_new
 
     if doe_new == 0:
@@ -621,12 +1309,13 @@ def main() -> None:
     else:
         print(f"  {doe_new} publicação(ões) nova(s) no DOE SP.")
 
-    save_history(history)
+    flush_whatsapp()
+    history.save()
     print(f"\n{'='*60}")
     print(f"Execução finalizada.")
     print(f"  Documentos novos processados: {total_new}")
     print(f"  Total no histórico: {len(history)}")
-    print(f"  Histórico salvo em {HISTORY_FILE}")
+    print(f"  Histórico salvo em {HISTORY_DIR}")
 
 
 if __name__ == "__main__":